@@ -19,6 +19,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Max rows rendered in the on-screen results table
+PREVIEW_ROWS = 200
+
+# Introduction email shown alongside discovery results
+EMAIL_TEMPLATE = """Subject: Introduction - [Your Fund Name] - [Brief Value Proposition]
+
+Dear [LP Name],
+
+I hope this message finds you well. I'm reaching out because [Your Fund Name] aligns with [Firm Name]'s investment focus in [relevant industry/focus area].
+
+**About [Your Fund Name]:**
+[Brief 2-3 sentence description of your fund, strategy, and key differentiators]
+
+**Why This May Be of Interest:**
+- [Specific reason 1 related to their investment criteria/interests]
+- [Specific reason 2 related to their portfolio or focus areas]
+- [Specific reason 3 - track record, unique opportunity, etc.]
+
+I would welcome the opportunity to discuss how [Your Fund Name] might fit within [Firm Name]'s portfolio. Would you be available for a brief call in the coming weeks?
+
+Thank you for your consideration, and I look forward to the possibility of connecting.
+
+Best regards,
+[Your Name]
+[Your Title]
+[Your Fund Name]
+[Your Contact Information]"""
+
 # Custom CSS to ensure high contrast black/white
 st.markdown("""
 <style>
@@ -40,6 +68,21 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(max_entries=1)
+def _load_agent(path, mtime):
+    """Agent shared by every session in the process; mtime is only part of the cache key"""
+    return LPOutreachAgent(path)
+
+def get_agent(path='lp_database.csv'):
+    """Cached agent, reloaded whenever the CSV changes on disk (main.py runs, hand edits)"""
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    return _load_agent(path, mtime)
+
+@st.cache_data
+def parse_csv_list(text: str) -> tuple:
+    """Split a comma separated widget value into stripped, non-empty items"""
+    return tuple(item.strip() for item in text.split(",") if item.strip())
+
 def main():
     st.title("🔍 LP Discovery Agent")
     st.markdown("Automated Investor Discovery System")
@@ -146,8 +189,8 @@ def main():
             use_preferences=use_preferences,
             ebitda_range=(ebitda_min, ebitda_max),
             revenue_range=(rev_min, rev_max),
-            industries=[i.strip() for i in industries_input.split(",") if i.strip()],
-            preferences=[p.strip() for p in preferences_input.split(",") if p.strip()]
+            industries=list(parse_csv_list(industries_input)),
+            preferences=list(parse_csv_list(preferences_input))
         )
         
         # Build Search Config
@@ -158,14 +201,27 @@ def main():
             categories=selected_categories
         )
         
+        # Invalidate results from any previous run
+        for key in ('results', 'results_df', 'results_csv'):
+            st.session_state.pop(key, None)
+        
         # Run Discovery
         with st.status("Running Discovery Process...", expanded=True) as status:
             try:
-                st.write("Initializing Gemini Engine...")
+                # Single placeholder so progress costs one message per update, not per line
+                progress = st.empty()
                 engine = LPDiscoveryEngine(api_key)
                 
-                st.write(f"Searching for LPs across {len(selected_categories)} categories...")
+                progress.markdown(
+                    "- Initialized Gemini Engine\n"
+                    f"- Searching for LPs across {len(selected_categories)} categories..."
+                )
+                # search_lps batches or parallelizes the queries itself
                 results = engine.search_lps(criteria, config)
+                progress.markdown(
+                    "- Initialized Gemini Engine\n"
+                    f"- Searched {len(selected_categories)} categories, {len(results)} unique LPs"
+                )
                 
                 if not results:
                     status.update(label="Discovery Complete - No Results Found", state="error")
@@ -174,8 +230,12 @@ def main():
                     status.update(label="Discovery Complete!", state="complete")
                     st.success(f"Found {len(results)} potential investors!")
                     
-                    # Store results in session state to persist
+                    # Store results and derived artifacts in session state so reruns
+                    # don't rebuild the DataFrame or re-encode the CSV
+                    results_df = pd.DataFrame(results)
                     st.session_state['results'] = results
+                    st.session_state['results_df'] = results_df
+                    st.session_state['results_csv'] = results_df.to_csv(index=False).encode('utf-8')
                     
             except Exception as e:
                 status.update(label="Error Occurred", state="error")
@@ -184,34 +244,35 @@ def main():
                     st.error("Quota Exceeded. Please check your API plan or wait a few minutes.")
 
     # --- Results Display ---
-    if 'results' in st.session_state:
+    if st.session_state.get('results'):
         results = st.session_state['results']
         
         st.subheader("Discovered LPs")
+        df = st.session_state['results_df']
         
-        # Convert to DataFrame for display
-        df = pd.DataFrame(results)
-        
-        # Show interactive table
+        # Show interactive table (preview only; the CSV download has the full set)
+        preview = df[['LP_Name', 'Firm', 'LP_Category', 'Confidence_Score', 'Email', 'Interests']].head(PREVIEW_ROWS)
         st.dataframe(
-            df[['LP_Name', 'Firm', 'LP_Category', 'Confidence_Score', 'Email', 'Interests']],
+            preview,
             use_container_width=True,
             hide_index=True
         )
+        if len(df) > PREVIEW_ROWS:
+            st.caption(f"Showing {PREVIEW_ROWS} of {len(df)} rows — download CSV for full set")
         
         # Import Action
         col_import, col_dl = st.columns(2)
         with col_import:
             if st.button("💾 Save to Database"):
-                agent = LPOutreachAgent()
+                agent = get_agent()
                 count = agent.import_discovered_lps(results)
+                agent.flush()
                 st.success(f"Successfully saved {count} new LPs to lp_database.csv")
                 
         with col_dl:
-            csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(
                 "📥 Download raw CSV",
-                csv,
+                st.session_state['results_csv'],
                 "discovered_lps.csv",
                 "text/csv",
                 key='download-csv'
@@ -222,40 +283,16 @@ def main():
         st.subheader("📧 Recommended Introduction Email Template")
         st.markdown("Use this template as a starting point for your LP outreach:")
         
-        email_template = """Subject: Introduction - [Your Fund Name] - [Brief Value Proposition]
-
-Dear [LP Name],
-
-I hope this message finds you well. I'm reaching out because [Your Fund Name] aligns with [Firm Name]'s investment focus in [relevant industry/focus area].
-
-**About [Your Fund Name]:**
-[Brief 2-3 sentence description of your fund, strategy, and key differentiators]
-
-**Why This May Be of Interest:**
-- [Specific reason 1 related to their investment criteria/interests]
-- [Specific reason 2 related to their portfolio or focus areas]
-- [Specific reason 3 - track record, unique opportunity, etc.]
-
-I would welcome the opportunity to discuss how [Your Fund Name] might fit within [Firm Name]'s portfolio. Would you be available for a brief call in the coming weeks?
-
-Thank you for your consideration, and I look forward to the possibility of connecting.
-
-Best regards,
-[Your Name]
-[Your Title]
-[Your Fund Name]
-[Your Contact Information]"""
-        
         st.text_area(
             "Email Template",
-            email_template,
+            EMAIL_TEMPLATE,
             height=400,
             help="Copy and customize this template for your outreach. Remember to personalize each email based on the specific LP's interests and background."
         )
         
         # Copy button functionality
         if st.button("📋 Copy Email Template"):
-            st.code(email_template, language=None)
+            st.code(EMAIL_TEMPLATE, language=None)
             st.success("Template displayed above. Select and copy the text to use it.")
 
 if __name__ == "__main__":
@@ -71,6 +71,7 @@ def main():
     agent = LPOutreachAgent()
     if discovered_lps:
         imported_count = agent.import_discovered_lps(discovered_lps)
+        agent.flush()
         print(f"✓ Imported {imported_count} new LPs")
     else:
         print("✓ Database loaded")
@@ -119,12 +120,12 @@ def main():
     print(f"Top 5 Priority Targets:")
     print()
     
-    for i, (_, lp) in enumerate(targets.head(5).iterrows(), 1):
+    for i, lp in enumerate(targets.head(5).to_dict('records'), 1):
         print(f"{i}. {lp['LP_Name']}")
         print(f"   Firm: {lp['Firm']}")
         print(f"   Category: {lp.get('LP_Category', 'Unknown')}")
         print(f"   Confidence: {lp.get('Confidence_Score', 0)}%")
-        if pd.notna(lp.get('Email')):
+        if pd.notna(lp.get('Email')) and lp['Email'] != '':
             print(f"   Contact: {lp['Email']}")
         print()
     
@@ -1,12 +1,51 @@
 """
 Core LP Database Management Logic
 """
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from functools import lru_cache
 import os
+import re
+
+# Interaction type -> (new Status, new Next_Action)
+INTERACTION_TRANSITIONS = {
+    'Initial Outreach': ('Contacted', 'Follow-up in 1 week'),
+    'Follow-up': ('Engaged', 'Schedule Meeting'),
+    'Meeting': ('In Discussion', 'Send Deck'),
+}
+
+# Database schema, in file column order
+LP_COLUMNS = [
+    'LP_Name', 'Firm', 'Email', 'Interests', 'Status',
+    'Last_Contact', 'Next_Action', 'Notes',
+    # Fields for automated discovery
+    'LP_Category', 'EBITDA_Range', 'Revenue_Range', 
+    'Investment_Preferences', 'Industries', 'Deal_History',
+    'Discovery_Date', 'Confidence_Score'
+]
+
+# Read every text column as an Arrow-backed string so missing cells load as ''
+# rather than NaN and filters run on Arrow compute kernels;
+# Confidence_Score is coerced to a number after loading
+_DTYPES = {col: 'string[pyarrow]' for col in LP_COLUMNS if col != 'Confidence_Score'}
+
+def _coerce_scores(df):
+    """Parse Confidence_Score as float32 in place; missing or invalid scores become 0"""
+    scores = df['Confidence_Score'] if 'Confidence_Score' in df.columns else pd.Series(0, index=df.index)
+    df['Confidence_Score'] = pd.to_numeric(scores, errors='coerce').fillna(0).astype('float32')
+    return df
+
+@lru_cache(maxsize=64)
+def industry_pattern(industries):
+    """Build an escaped regex alternation for a (sorted) tuple of industries"""
+    return '|'.join(map(re.escape, industries))
 
 class LPOutreachAgent:
     def __init__(self, data_file='lp_database.csv'):
+        # Set when in-memory changes have not been written to disk yet
+        self._dirty = False
+        
         # Ensure data file is stored in root directory even if run from src
         if not os.path.isabs(data_file):
             # Assuming CWD is root of project
@@ -15,35 +54,54 @@ class LPOutreachAgent:
             self.data_file = data_file
             
         try:
-            self.lps = pd.read_csv(self.data_file)
+            self.lps = pd.read_csv(
+                self.data_file,
+                dtype=_DTYPES,
+                keep_default_na=False
+            )
             
             # Ensure all required columns exist (schema migration)
-            required_columns = [
-                'LP_Name', 'Firm', 'Email', 'Interests', 'Status',
-                'Last_Contact', 'Next_Action', 'Notes',
-                'LP_Category', 'EBITDA_Range', 'Revenue_Range', 
-                'Investment_Preferences', 'Industries', 'Deal_History',
-                'Discovery_Date', 'Confidence_Score'
-            ]
-            
-            for col in required_columns:
+            for col in LP_COLUMNS:
                 if col not in self.lps.columns:
                     self.lps[col] = ''
             
         except FileNotFoundError:
             # Initialize empty DataFrame if file doesn't exist
-            self.lps = pd.DataFrame(columns=[
-                'LP_Name', 'Firm', 'Email', 'Interests', 'Status',
-                'Last_Contact', 'Next_Action', 'Notes',
-                # New fields for automated discovery
-                'LP_Category', 'EBITDA_Range', 'Revenue_Range', 
-                'Investment_Preferences', 'Industries', 'Deal_History',
-                'Discovery_Date', 'Confidence_Score'
-            ])
+            self.lps = pd.DataFrame(columns=LP_COLUMNS)
             self.save_data()
+        
+        # Parse scores once at load so filters and sorts work on a numeric column
+        _coerce_scores(self.lps)
+        
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Build hash lookups for firm membership and LP name -> row index"""
+        self._firm_index = set(self.lps['Firm'].dropna().astype(str))
+        self._name_to_idx = {}
+        for idx, name in zip(self.lps.index, self.lps['LP_Name']):
+            if pd.notna(name):
+                # Keep the first occurrence, matching the previous lookup semantics
+                self._name_to_idx.setdefault(name, idx)
+
+    def _index_new_rows(self, rows, start_idx):
+        """Register rows appended at positions start_idx.. in the lookups"""
+        for offset, row in enumerate(rows):
+            firm = row.get('Firm')
+            if pd.notna(firm):
+                self._firm_index.add(str(firm))
+            name = row.get('LP_Name')
+            if pd.notna(name):
+                self._name_to_idx.setdefault(name, start_idx + offset)
 
     def save_data(self):
         self.lps.to_csv(self.data_file, index=False)
+        self._dirty = False
+
+    def flush(self):
+        """Write pending batch imports to disk (call once after import_discovered_lps)"""
+        if self._dirty:
+            self.save_data()
 
     def add_lp(self, name, firm, email, interests, lp_category='', ebitda_range='', 
                revenue_range='', investment_preferences='', industries='', deal_history='',
@@ -67,17 +125,19 @@ class LPOutreachAgent:
             'Discovery_Date': discovery_date,
             'Confidence_Score': confidence_score
         }
-        self.lps = pd.concat([self.lps, pd.DataFrame([new_lp])], ignore_index=True)
+        start_idx = len(self.lps)
+        self.lps = pd.concat([self.lps, _coerce_scores(pd.DataFrame([new_lp]))], ignore_index=True)
+        self._index_new_rows([new_lp], start_idx)
         self.save_data()
         print(f"Added LP: {name} from {firm}")
 
     def generate_outreach_message(self, lp_name, fund_name, value_prop, intro_source=None):
         # Check if LP exists
-        lp_match = self.lps[self.lps['LP_Name'] == lp_name]
-        if lp_match.empty:
+        idx = self._name_to_idx.get(lp_name)
+        if idx is None:
             return f"Error: LP '{lp_name}' not found in database."
         
-        lp = lp_match.iloc[0]
+        lp = self.lps.loc[idx]
         interests = lp['Interests']
         
         message = f"Subject: Exploring Opportunities in {fund_name}\n\n"
@@ -92,61 +152,64 @@ class LPOutreachAgent:
 
     def log_interaction(self, lp_name, interaction_type, notes=''):
         # Check if LP exists
-        lp_match = self.lps[self.lps['LP_Name'] == lp_name]
-        if lp_match.empty:
+        idx = self._name_to_idx.get(lp_name)
+        if idx is None:
             print(f"Error: LP '{lp_name}' not found in database.")
             return
         
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        idx = lp_match.index[0]
-        self.lps.at[idx, 'Last_Contact'] = now
         current_notes = self.lps.at[idx, 'Notes']
         if pd.isna(current_notes):
             current_notes = ''
-        self.lps.at[idx, 'Notes'] = current_notes + f"\n{now}: {interaction_type} - {notes}"
+        new_notes = current_notes + f"\n{now}: {interaction_type} - {notes}"
         
         # Update status and next action based on interaction
-        if interaction_type == 'Initial Outreach':
-            self.lps.at[idx, 'Status'] = 'Contacted'
-            self.lps.at[idx, 'Next_Action'] = 'Follow-up in 1 week'
-        elif interaction_type == 'Follow-up':
-            self.lps.at[idx, 'Status'] = 'Engaged'
-            self.lps.at[idx, 'Next_Action'] = 'Schedule Meeting'
-        elif interaction_type == 'Meeting':
-            self.lps.at[idx, 'Status'] = 'In Discussion'
-            self.lps.at[idx, 'Next_Action'] = 'Send Deck'
+        status, next_action = INTERACTION_TRANSITIONS.get(interaction_type, (None, None))
+        self.lps.loc[idx, ['Last_Contact', 'Notes', 'Status', 'Next_Action']] = [
+            now,
+            new_notes,
+            status or self.lps.at[idx, 'Status'],
+            next_action or self.lps.at[idx, 'Next_Action'],
+        ]
         self.save_data()
         print(f"Logged interaction for {lp_name}: {interaction_type}")
 
     def get_summary(self):
-        summary = self.lps.groupby('Status').size().reset_index(name='Count')
-        return summary
+        # sort_index keeps the alphabetical Status order groupby used to produce
+        summary = self.lps['Status'].value_counts().sort_index()
+        return summary.rename_axis('Status').reset_index(name='Count')
 
     def recommend_actions(self):
-        actions = []
-        for _, lp in self.lps.iterrows():
-            if lp['Next_Action'] and pd.notna(lp['Next_Action']):
-                actions.append(f"{lp['LP_Name']}: {lp['Next_Action']}")
-        return actions
+        next_action = self.lps['Next_Action']
+        mask = next_action.notna() & (next_action != '')
+        return [f"{name}: {action}" for name, action in
+                zip(self.lps.loc[mask, 'LP_Name'], next_action[mask])]
     
     def import_discovered_lps(self, discovered_lps):
         """Batch import LPs from discovery engine"""
         
-        imported_count = 0
+        # Dedupe within the batch first (first occurrence wins), then drop firms
+        # already in the database with one pass of set lookups
+        incoming = {}
         for lp in discovered_lps:
-            # Check if LP already exists
-            existing = self.lps[self.lps['Firm'] == lp.get('Firm', '')]
-            if existing.empty:
-                # Add discovery date if not present
-                if not lp.get('Discovery_Date'):
-                    lp['Discovery_Date'] = datetime.now().strftime('%Y-%m-%d')
-                
-                # Create new LP entry
-                new_lp = pd.DataFrame([lp])
-                self.lps = pd.concat([self.lps, new_lp], ignore_index=True)
-                imported_count += 1
+            incoming.setdefault(lp.get('Firm', ''), lp)
+        new_rows = [lp for firm, lp in incoming.items() if firm not in self._firm_index]
+        
+        # Add discovery date if not present
+        today = datetime.now().strftime('%Y-%m-%d')
+        for lp in new_rows:
+            if not lp.get('Discovery_Date'):
+                lp['Discovery_Date'] = today
+        
+        # Single concat instead of one per row
+        if new_rows:
+            start_idx = len(self.lps)
+            # Scores are coerced up front so the column stays numeric
+            self.lps = pd.concat([self.lps, _coerce_scores(pd.DataFrame(new_rows))], ignore_index=True)
+            self._index_new_rows(new_rows, start_idx)
+            self._dirty = True
+        imported_count = len(new_rows)
         
-        self.save_data()
         print(f"Imported {imported_count} new LPs (skipped {len(discovered_lps) - imported_count} duplicates)")
         return imported_count
     
@@ -158,11 +221,13 @@ class LPOutreachAgent:
             filtered = filtered[filtered['LP_Category'] == category]
         
         if min_confidence > 0:
-            filtered = filtered[pd.to_numeric(filtered['Confidence_Score'], errors='coerce') >= min_confidence]
+            filtered = filtered[filtered['Confidence_Score'] >= min_confidence]
         
         if industries:
             # Filter by industries (partial match)
-            industry_mask = filtered['Industries'].str.contains('|'.join(industries), case=False, na=False)
+            pattern = industry_pattern(tuple(sorted(industries)))
+            # Plain string pattern so Arrow-backed columns use the native regex kernel
+            industry_mask = filtered['Industries'].str.contains(pattern, case=False, na=False)
             filtered = filtered[industry_mask]
         
         if status:
@@ -184,25 +249,25 @@ class LPOutreachAgent:
     
     def generate_daily_target_list(self, target_count=10, prioritize_category=None):
         """Generate prioritized daily target list"""
-        # Filter prospects and contacted LPs
-        targets = self.lps[self.lps['Status'].isin(['Prospect', 'Contacted'])].copy()
+        # Filter prospects and contacted LPs (positions only, no row copy)
+        mask = self.lps['Status'].isin(['Prospect', 'Contacted']).to_numpy(dtype=bool, na_value=False)
+        positions = np.flatnonzero(mask)
         
-        if targets.empty:
+        if len(positions) == 0:
             return pd.DataFrame()
         
-        # Calculate priority score
-        targets['Priority_Score'] = 0
-        
         # Higher confidence = higher priority
-        targets['Priority_Score'] += pd.to_numeric(targets['Confidence_Score'], errors='coerce').fillna(0) * 0.5
+        score = self.lps['Confidence_Score'].to_numpy(dtype=np.float32)[positions] * 0.5
         
         # Prospects get higher priority than contacted
-        targets.loc[targets['Status'] == 'Prospect', 'Priority_Score'] += 30
+        score += 30 * self.lps['Status'].eq('Prospect').to_numpy(dtype=bool, na_value=False)[positions]
         
         # Prioritize specific category if requested
         if prioritize_category:
-            targets.loc[targets['LP_Category'] == prioritize_category, 'Priority_Score'] += 20
+            score += 20 * self.lps['LP_Category'].eq(prioritize_category).to_numpy(dtype=bool, na_value=False)[positions]
         
-        # Sort by priority and return top N
-        targets = targets.sort_values('Priority_Score', ascending=False)
-        return targets.head(target_count)
+        # Select the top N in O(N), then order just those by priority
+        n = min(target_count, len(score))
+        top = np.argpartition(-score, n)[:n] if n < len(score) else np.arange(len(score))
+        top = top[np.argsort(-score[top], kind='stable')]
+        return self.lps.iloc[positions[top]].assign(Priority_Score=score[top])
@@ -3,50 +3,293 @@ LP Discovery Engine using Gemini API
 Automatically discovers and categorizes Limited Partners based on investment criteria
 """
 from google import genai
-from google.genai import types
-from typing import List, Dict, Optional
+from google.genai import errors, types
+from typing import List, Dict, Literal, Optional, Set, Tuple
+from difflib import SequenceMatcher
+from functools import lru_cache
+import asyncio
+import hashlib
 import json
+import os
 import re
+import time
+import httpx
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 from .config import SearchConfig, InvestmentCriteria
 
+# Max Gemini requests in flight at once (keeps bursts under the QPM limit)
+MAX_CONCURRENT_SEARCHES = 10
+
+# Attempts per Gemini request before a search is given up on
+MAX_RETRY_ATTEMPTS = 5
+
+# On-disk cache of raw Gemini responses, keyed on (model, response schema, prompt)
+CACHE_DIR = '.gemini_cache'
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Firm-name normalization for deduplication
+_PUNCT_RE = re.compile(r'[^a-z0-9\s]+')
+# Trailing legal-entity suffixes only; descriptive words such as "Capital" or
+# "Partners" tell firms apart ("Summit Partners" vs "Summit Capital")
+_FIRM_SUFFIX_RE = re.compile(r'(\s+(llc|lp|inc|ltd))+$')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+# Names that differ only in their last word (e.g. a fund number) and are at
+# least this similar are treated as the same firm
+FUZZY_MATCH_THRESHOLD = 0.9
+
+# Keywords used to categorize 'Mixed' results, in priority order (default: GP Investor)
+_CATEGORY_KEYWORDS = [
+    ('Family Office', {'family office'}),
+    ('Fund Investor', {'fund', 'institutional'}),
+    ('HNW Individual', {'individual', 'angel', 'hnw'}),
+]
+_CATEGORY_RE = re.compile('|'.join(k for _, keywords in _CATEGORY_KEYWORDS for k in sorted(keywords)))
+
+# Prompt templates, filled in with str.format per search
+_GP_PROMPT_TMPL = """Find General Partner (GP) investors and venture capital firms that invest in companies with the following criteria:
+{criteria}
+
+Please provide a list of 10-15 GP investors with:
+1. Investor/Firm Name
+2. Contact person (if available)
+3. Email or website
+4. Investment focus/industries
+5. Notable deals or portfolio companies
+6. Investment size preference
+
+Format the response as a JSON array of objects."""
+
+_FUND_PROMPT_TMPL = """Find institutional fund investors (Limited Partners) that invest in venture capital and private equity funds, particularly those interested in:
+{criteria}
+
+Please provide a list of 10-15 fund investors with:
+1. Investor/Institution Name
+2. Contact person (if available)
+3. Email or website
+4. Investment focus/strategy
+5. Fund commitments or portfolio
+6. Preferences (emerging managers, special situations, etc.)
+
+Format the response as a JSON array of objects."""
+
+_HNW_PROMPT_TMPL = """Find High Net Worth (HNW) individual investors and angel investors who invest in companies or funds with:
+{criteria}
+
+Please provide a list of 10-15 HNW individuals with:
+1. Investor Name
+2. Background/Company affiliation
+3. Contact information or LinkedIn
+4. Investment interests
+5. Notable investments
+6. Investment preferences
+
+Format the response as a JSON array of objects."""
+
+_FAMILY_OFFICE_PROMPT_TMPL = """Find family offices that invest in companies or funds with:
+{criteria}
+
+Please provide a list of 10-15 family offices with:
+1. Family Office Name
+2. Principal family or contact
+3. Contact information or website
+4. Investment focus/sectors
+5. Investment history or portfolio
+6. Investment preferences (emerging managers, special situations, etc.)
+
+Format the response as a JSON array of objects."""
+
+_INDUSTRY_PROMPT_TMPL = """Find investors (GPs, funds, family offices, or HNW individuals) specifically focused on the {industry} industry who invest in companies with:
+- EBITDA: ${ebitda_min}M - ${ebitda_max}M
+- Revenue: ${revenue_min}M - ${revenue_max}M
+
+Please provide a list of 10 investors with:
+1. Investor Name and Type (GP/Fund/Family Office/HNW)
+2. Contact information
+3. Investment focus
+4. Notable {industry} investments
+5. Investment preferences
+
+Format the response as a JSON array of objects."""
+
+_COMBINED_PROMPT_TMPL = """Find investors in each of these categories: {categories}.
+They should invest in companies or funds with:
+{criteria}
+
+For each category, provide 10-15 investors with:
+1. Investor/Firm Name
+2. Contact person (if available)
+3. Email, website or LinkedIn
+4. Investment focus/industries
+5. Notable deals or portfolio companies
+6. Investment preferences (size, emerging managers, special situations, etc.)
+
+Set each investor's category to exactly one of: {categories}.
+
+Format the response as a JSON array of objects."""
+
+# Category -> (search description, prompt template)
+_CATEGORY_QUERIES = {
+    "GP Investor": ('GP investors in target industries', _GP_PROMPT_TMPL),
+    "Fund Investor": ('Fund investors (LPs in VC/PE funds)', _FUND_PROMPT_TMPL),
+    "HNW Individual": ('High Net Worth individuals', _HNW_PROMPT_TMPL),
+    "Family Office": ('Family offices', _FAMILY_OFFICE_PROMPT_TMPL),
+}
+
+# Categories with a dedicated search prompt
+LP_CATEGORIES = tuple(_CATEGORY_QUERIES)
+
+def _firm_tokens(name: str) -> List[str]:
+    """Lowercase words of a firm name, punctuation and trailing entity suffixes removed"""
+    words = _PUNCT_RE.sub('', str(name).lower()).strip()
+    # Names made only of suffix words ("LLC") keep them
+    return (_FIRM_SUFFIX_RE.sub('', words) or words).split()
+
+def _normalize_firm(name: str) -> str:
+    """Exact dedup key for a firm: its normalized words run together"""
+    return ''.join(_firm_tokens(name))
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits (429), server errors (5xx), timeouts and dropped connections are worth retrying"""
+    if isinstance(exc, errors.APIError):
+        return exc.code == 429 or (exc.code or 0) >= 500
+    # google-genai sends requests through httpx; TransportError covers timeouts and
+    # connections refused or dropped mid-stream (ReadError, RemoteProtocolError)
+    return isinstance(exc, (httpx.TransportError, TimeoutError))
+
+class LPRecord(BaseModel):
+    """Response schema Gemini must follow for each discovered LP"""
+    name: str = Field(description="Investor, firm, family office or individual name")
+    firm: str = Field(description="Firm or family office name; repeat the name for individuals")
+    investor_type: str = Field(description="GP, Fund, Family Office or HNW Individual")
+    # Optional so Gemini can omit unknown details instead of filling placeholders
+    # ("N/A") that would count towards the confidence score
+    contact: Optional[str] = Field(default=None, description="Contact email, website or LinkedIn; omit if unknown")
+    focus: Optional[str] = Field(default=None, description="Investment focus, strategy or industries; omit if unknown")
+    deals: Optional[str] = Field(default=None, description="Notable deals, investments or portfolio companies; omit if unknown")
+    preferences: Optional[str] = Field(default=None, description="Investment size or other preferences; omit if unknown")
+
+# Schema fields, in declaration order
+LP_RECORD_FIELDS = list(LPRecord.model_fields)
+
+# Confidence points (0-100) awarded for each schema field that is filled in
+CONFIDENCE_WEIGHTS = {
+    'name': 30,         # Name present (required)
+    'contact': 25,      # Contact info present
+    'focus': 20,        # Investment focus described
+    'deals': 15,        # Deal history present
+    'preferences': 10,  # Additional details
+}
+_CONFIDENCE_FIELDS = list(CONFIDENCE_WEIGHTS)
+_CONFIDENCE_VECTOR = np.array(list(CONFIDENCE_WEIGHTS.values()))
+
+# Ask for validated JSON matching LPRecord so responses need no text scraping
+_SEARCH_RESPONSE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[LPRecord]
+)
+
+@lru_cache(maxsize=16)
+def _combined_response_config(categories: Tuple[str, ...]) -> types.GenerateContentConfig:
+    """Combined-search schema: LPRecord plus a category restricted to the requested ones"""
+    record = create_model(
+        'CategorizedLPRecord',
+        __base__=LPRecord,
+        category=(Literal[categories], Field(description="Exactly one of the requested categories"))
+    )
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=list[record]
+    )
+
 class LPDiscoveryEngine:
     """Main engine for discovering LPs using Gemini API"""
     
-    def __init__(self, api_key: str):
-        """Initialize the discovery engine with Gemini API key"""
+    def __init__(self, api_key: str, cache_dir: Optional[str] = CACHE_DIR):
+        """Initialize the discovery engine with Gemini API key (cache_dir=None disables caching)"""
         # Configure the new google.genai Client
         self.client = genai.Client(api_key=api_key)
         self.model_name = 'gemini-2.0-flash'
+        self.cache_dir = cache_dir
         
     def search_lps(self, criteria: InvestmentCriteria, config: SearchConfig) -> List[Dict]:
         """
         Execute LP search based on investment criteria
         Returns list of discovered LPs with structured data
         """
-        all_lps = []
+        return asyncio.run(self.search_lps_async(criteria, config))
+    
+    async def search_lps_async(self, criteria: InvestmentCriteria, config: SearchConfig) -> List[Dict]:
+        """
+        Execute all search queries concurrently
+        Wall time is roughly that of the slowest query rather than the sum
+        """
+        raw_lps = []
+        # Firm keys seen so far, so duplicates are dropped as results arrive
+        seen_names = set()
+        # Near-duplicate candidates bucketed by key prefix to keep fuzzy comparisons small
+        buckets = {}
         
-        # Generate search queries based on criteria
-        search_queries = self._generate_search_queries(criteria, config)
+        # Generate search queries based on criteria; outside comprehensive mode
+        # all categories are requested in a single call
+        categories = [c for c in config.categories if c in LP_CATEGORIES]
+        combined = config.search_depth != "comprehensive" and len(categories) > 1
+        if combined:
+            search_queries = [self._generate_combined_query(criteria, config)]
+        else:
+            search_queries = self._generate_search_queries(criteria, config)
         
-        print(f"Executing {len(search_queries)} search queries...")
+        results = await self._run_searches(search_queries)
+        
+        # A truncated or malformed combined response loses every category at once,
+        # so retry those as separate per-category searches
+        if combined and not any(results):
+            print("Combined search returned no results; falling back to per-category searches")
+            search_queries = self._generate_search_queries(criteria, config)
+            results = await self._run_searches(search_queries)
         
-        for i, query in enumerate(search_queries, 1):
+        for i, (query, lps) in enumerate(zip(search_queries, results), 1):
             print(f"\nSearch {i}/{len(search_queries)}: {query['description']}")
-            lps = self._execute_search(query['prompt'], query['category'], criteria)
-            all_lps.extend(lps)
             print(f"  Found {len(lps)} potential LPs")
+            
+            # Keep only firms not already collected; records without a name are
+            # dropped by enrichment anyway, so they never claim a firm key
+            for lp in lps:
+                # The schema restricts categories to the selection; anything else the
+                # model returns anyway is re-derived from the record's content
+                if combined and lp.get('category') not in categories:
+                    lp['category'] = 'Mixed'
+                name = lp.get('name') or ''
+                firm = lp.get('firm') or name
+                # Individuals' "firm" is their own name, so they are matched exactly
+                fuzzy = lp.get('category') != 'HNW Individual' and _normalize_firm(firm) != _normalize_firm(name)
+                if name and self._is_new_firm(firm, seen_names, buckets, fuzzy):
+                    raw_lps.append(lp)
         
-        # Remove duplicates based on firm name
-        unique_lps = self._deduplicate_lps(all_lps)
+        # Validate and enrich the unique results in one batch
+        unique_lps = self._enrich_lps(raw_lps, criteria)
         print(f"\nTotal unique LPs discovered: {len(unique_lps)}")
         
         return unique_lps
     
-    def _generate_search_queries(self, criteria: InvestmentCriteria, config: SearchConfig) -> List[Dict]:
-        """Generate targeted search queries based on criteria and categories"""
-        queries = []
+    async def _run_searches(self, search_queries: List[Dict]) -> List[List[Dict]]:
+        """Run queries concurrently; a failed search yields an empty record list"""
+        print(f"Executing {len(search_queries)} search queries...")
         
-        # Build criteria description dynamically based on toggles
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+        tasks = [
+            self._execute_search_async(
+                query['prompt'], query['category'], semaphore,
+                query.get('response_config', _SEARCH_RESPONSE_CONFIG)
+            )
+            for query in search_queries
+        ]
+        return await asyncio.gather(*tasks)
+    
+    def _build_criteria_description(self, criteria: InvestmentCriteria) -> str:
+        """Build the criteria block shared by all prompts, based on toggles"""
         criteria_desc = "Investment Criteria:\n"
         
         if criteria.use_ebitda:
@@ -64,78 +307,34 @@ class LPDiscoveryEngine:
         if criteria.company_targets:
             criteria_desc += f"- Company Targets: {', '.join(criteria.company_targets)}\n"
         
+        return criteria_desc
+    
+    def _generate_combined_query(self, criteria: InvestmentCriteria, config: SearchConfig) -> Dict:
+        """Generate one query covering every requested category"""
+        criteria_desc = self._build_criteria_description(criteria)
+        categories = tuple(c for c in config.categories if c in LP_CATEGORIES)
+        
+        return {
+            'category': 'Mixed',
+            'description': f"All categories in one request ({', '.join(categories)})",
+            'response_config': _combined_response_config(categories),
+            'prompt': _COMBINED_PROMPT_TMPL.format(categories=', '.join(categories), criteria=criteria_desc)
+        }
+    
+    def _generate_search_queries(self, criteria: InvestmentCriteria, config: SearchConfig) -> List[Dict]:
+        """Generate targeted search queries based on criteria and categories"""
+        queries = []
+        criteria_desc = self._build_criteria_description(criteria)
+        
         # Category-specific searches
         for category in config.categories:
-            if category == "GP Investor":
+            query = _CATEGORY_QUERIES.get(category)
+            if query:
+                description, template = query
                 queries.append({
                     'category': category,
-                    'description': f'GP investors in target industries',
-                    'prompt': f"""Find General Partner (GP) investors and venture capital firms that invest in companies with the following criteria:
-{criteria_desc}
-
-Please provide a list of 10-15 GP investors with:
-1. Investor/Firm Name
-2. Contact person (if available)
-3. Email or website
-4. Investment focus/industries
-5. Notable deals or portfolio companies
-6. Investment size preference
-
-Format the response as a JSON array of objects."""
-                })
-            
-            elif category == "Fund Investor":
-                queries.append({
-                    'category': category,
-                    'description': f'Fund investors (LPs in VC/PE funds)',
-                    'prompt': f"""Find institutional fund investors (Limited Partners) that invest in venture capital and private equity funds, particularly those interested in:
-{criteria_desc}
-
-Please provide a list of 10-15 fund investors with:
-1. Investor/Institution Name
-2. Contact person (if available)
-3. Email or website
-4. Investment focus/strategy
-5. Fund commitments or portfolio
-6. Preferences (emerging managers, special situations, etc.)
-
-Format the response as a JSON array of objects."""
-                })
-            
-            elif category == "HNW Individual":
-                queries.append({
-                    'category': category,
-                    'description': f'High Net Worth individuals',
-                    'prompt': f"""Find High Net Worth (HNW) individual investors and angel investors who invest in companies or funds with:
-{criteria_desc}
-
-Please provide a list of 10-15 HNW individuals with:
-1. Investor Name
-2. Background/Company affiliation
-3. Contact information or LinkedIn
-4. Investment interests
-5. Notable investments
-6. Investment preferences
-
-Format the response as a JSON array of objects."""
-                })
-            
-            elif category == "Family Office":
-                queries.append({
-                    'category': category,
-                    'description': f'Family offices',
-                    'prompt': f"""Find family offices that invest in companies or funds with:
-{criteria_desc}
-
-Please provide a list of 10-15 family offices with:
-1. Family Office Name
-2. Principal family or contact
-3. Contact information or website
-4. Investment focus/sectors
-5. Investment history or portfolio
-6. Investment preferences (emerging managers, special situations, etc.)
-
-Format the response as a JSON array of objects."""
+                    'description': description,
+                    'prompt': template.format(criteria=criteria_desc)
                 })
         
         # Industry-specific searches if specified and enabled matches
@@ -144,165 +343,181 @@ Format the response as a JSON array of objects."""
                 queries.append({
                     'category': 'Mixed',
                     'description': f'Investors focused on {industry}',
-                    'prompt': f"""Find investors (GPs, funds, family offices, or HNW individuals) specifically focused on the {industry} industry who invest in companies with:
-- EBITDA: ${criteria.ebitda_range[0]}M - ${criteria.ebitda_range[1]}M
-- Revenue: ${criteria.revenue_range[0]}M - ${criteria.revenue_range[1]}M
-
-Please provide a list of 10 investors with:
-1. Investor Name and Type (GP/Fund/Family Office/HNW)
-2. Contact information
-3. Investment focus
-4. Notable {industry} investments
-5. Investment preferences
-
-Format the response as a JSON array of objects."""
+                    'prompt': _INDUSTRY_PROMPT_TMPL.format(
+                        industry=industry,
+                        ebitda_min=criteria.ebitda_range[0],
+                        ebitda_max=criteria.ebitda_range[1],
+                        revenue_min=criteria.revenue_range[0],
+                        revenue_max=criteria.revenue_range[1]
+                    )
                 })
         
         return queries
     
-    def _execute_search(self, prompt: str, category: str, criteria: InvestmentCriteria) -> List[Dict]:
-        """Execute a single search query using Gemini API"""
+    def _execute_search(self, prompt: str, category: str,
+                        response_config: types.GenerateContentConfig = _SEARCH_RESPONSE_CONFIG) -> List[Dict]:
+        """Execute a single search query using Gemini API, returning raw records tagged with a category"""
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            
-            # Extract and parse JSON from response
-            lps = self._parse_gemini_response(response.text, category)
+            response_text = self._read_cache(prompt, response_config)
+            if response_text is None:
+                response_text = self._generate(prompt, response_config)
+                
+                # Structured output: the response body is the JSON array itself
+                lps = json.loads(response_text)
+                self._write_cache(prompt, response_config, response_text)
+            else:
+                lps = json.loads(response_text)
             
-            # Validate and enrich LP data
-            validated_lps = []
+            # Combined-search records carry their own category
             for lp in lps:
-                enriched_lp = self._enrich_lp_data(lp, criteria, category)
-                if enriched_lp:
-                    validated_lps.append(enriched_lp)
+                lp['category'] = lp.get('category') or category
             
-            return validated_lps
+            return lps
             
         except Exception as e:
             print(f"  Error executing search: {str(e)}")
             return []
     
-    def _parse_gemini_response(self, response_text: str, category: str) -> List[Dict]:
-        """Parse Gemini API response and extract LP data"""
+    @retry(
+        stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
+        wait=wait_random_exponential(min=1, max=30),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True
+    )
+    def _generate(self, prompt: str, response_config: types.GenerateContentConfig) -> str:
+        """
+        Call Gemini, retrying transient failures with jittered exponential backoff
+        The response is streamed so transfer overlaps generation; a failure
+        mid-stream retries the whole request
+        """
+        chunks = []
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt,
+            config=response_config
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+        return ''.join(chunks)
+    
+    def _cache_path(self, prompt: str, response_config: types.GenerateContentConfig) -> str:
+        """Cache file for a (model, response schema, prompt) triple"""
+        # Hashing the schema means a changed LPRecord never serves records in the old shape
+        schema = json.dumps(TypeAdapter(response_config.response_schema).json_schema(), sort_keys=True)
+        key_source = f"{self.model_name}\n{response_config.response_mime_type}\n{schema}\n{prompt}"
+        key = hashlib.blake2b(key_source.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _read_cache(self, prompt: str, response_config: types.GenerateContentConfig) -> Optional[str]:
+        """Return a cached response if one exists and has not expired; expired entries are deleted"""
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(prompt, response_config)
+        try:
+            if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _write_cache(self, prompt: str, response_config: types.GenerateContentConfig, response_text: str):
+        """Store a response; failures only cost a future cache miss"""
+        if not self.cache_dir:
+            return
+        path = self._cache_path(prompt, response_config)
+        tmp_path = f"{path}.{os.getpid()}.{id(response_text)}.tmp"
         try:
-            # Try to find JSON array in the response
-            json_match = re.search(r'\[[\s\S]*\]', response_text)
-            if json_match:
-                lps_data = json.loads(json_match.group())
-                return lps_data
-            else:
-                # If no JSON found, try to parse structured text
-                return self._parse_structured_text(response_text, category)
-        except json.JSONDecodeError:
-            # Fallback to text parsing
-            return self._parse_structured_text(response_text, category)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(response_text)
+            # Atomic rename so concurrent searches never read a partial file
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  Warning: could not write response cache: {e}")
     
-    def _parse_structured_text(self, text: str, category: str) -> List[Dict]:
-        """Parse structured text response when JSON parsing fails"""
-        lps = []
-        
-        # Split by numbered items
-        items = re.split(r'\n\d+\.', text)
+    async def _execute_search_async(self, prompt: str, category: str, semaphore: asyncio.Semaphore,
+                                    response_config: types.GenerateContentConfig = _SEARCH_RESPONSE_CONFIG) -> List[Dict]:
+        """Run a blocking search on a worker thread, bounded by the semaphore"""
+        async with semaphore:
+            return await asyncio.to_thread(self._execute_search, prompt, category, response_config)
+    
+    def _enrich_lps(self, raw_lps: List[Dict], criteria: InvestmentCriteria) -> List[Dict]:
+        """Validate raw records and map them to database rows in one vectorized pass"""
+        if not raw_lps:
+            return []
         
-        for item in items[1:]:  # Skip first empty split
-            lp = {
-                'category': category,
-                'raw_text': item.strip()
-            }
-            
-            # Try to extract name (usually first line)
-            lines = item.strip().split('\n')
-            if lines:
-                lp['name'] = lines[0].strip('*- ').split(':')[0].strip()
-            
-            lps.append(lp)
+        df = pd.DataFrame(raw_lps).reindex(columns=LP_RECORD_FIELDS + ['category'])
+        df[LP_RECORD_FIELDS] = df[LP_RECORD_FIELDS].fillna('')
         
-        return lps[:15]  # Limit to 15 results
-    
-    def _enrich_lp_data(self, lp: Dict, criteria: InvestmentCriteria, category: str) -> Optional[Dict]:
-        """Enrich and validate LP data"""
         # Ensure required fields
-        if 'name' not in lp and 'Investor Name' in lp:
-            lp['name'] = lp['Investor Name']
-        elif 'name' not in lp and 'Investor/Firm Name' in lp:
-            lp['name'] = lp['Investor/Firm Name']
-        elif 'name' not in lp and 'Family Office Name' in lp:
-            lp['name'] = lp['Family Office Name']
+        df = df[df['name'] != '']
+        if df.empty:
+            return []
         
-        if 'name' not in lp or not lp['name']:
-            return None
+        # Records outside the known categories ('Mixed' searches) are categorized from their content
+        lp_category = df['category']
+        needs_category = ~lp_category.isin(LP_CATEGORIES)
+        if needs_category.any():
+            categorized = pd.Series(
+                [self.categorize_lp(lp) for lp in df.loc[needs_category, LP_RECORD_FIELDS].to_dict('records')],
+                index=df.index[needs_category]
+            )
+            lp_category = lp_category.where(~needs_category, categorized)
         
-        # Standardize field names
-        enriched = {
-            'LP_Name': lp.get('name', lp.get('Investor Name', '')),
-            'Firm': lp.get('Investor/Firm Name', lp.get('Family Office Name', lp.get('name', ''))),
-            'Email': lp.get('Email or website', lp.get('Contact information', lp.get('email', ''))),
-            'Interests': lp.get('Investment focus/industries', lp.get('Investment interests', '')),
-            'LP_Category': category if category != 'Mixed' else self.categorize_lp(lp),
+        # Map schema fields to database columns; criteria-derived values broadcast
+        enriched = pd.DataFrame({
+            'LP_Name': df['name'],
+            'Firm': df['firm'].where(df['firm'] != '', df['name']),
+            'Email': df['contact'],
+            'Interests': df['focus'],
+            'LP_Category': lp_category,
             'EBITDA_Range': f"${criteria.ebitda_range[0]}M-${criteria.ebitda_range[1]}M",
             'Revenue_Range': f"${criteria.revenue_range[0]}M-${criteria.revenue_range[1]}M",
             'Investment_Preferences': ', '.join(criteria.preferences),
             'Industries': ', '.join(criteria.industries) if criteria.industries else '',
-            'Deal_History': lp.get('Notable deals or portfolio companies', lp.get('Notable investments', '')),
-            'Confidence_Score': self._calculate_confidence_score(lp),
+            'Deal_History': df['deals'],
+            'Confidence_Score': self._calculate_confidence_scores(df),
             'Status': 'Prospect',
             'Next_Action': 'Initial Outreach',
-            'Notes': f"Discovered via automated search. {lp.get('raw_text', '')[:200]}"
-        }
+            'Notes': "Discovered via automated search."
+        })
         
-        return enriched
+        return enriched.to_dict('records')
     
     def categorize_lp(self, lp: Dict) -> str:
         """Categorize LP based on available information"""
-        lp_text = str(lp).lower()
+        lp_text = ' '.join(str(v) for v in lp.values()).lower()
         
-        if 'family office' in lp_text:
-            return 'Family Office'
-        elif 'fund' in lp_text or 'institutional' in lp_text:
-            return 'Fund Investor'
-        elif 'individual' in lp_text or 'angel' in lp_text or 'hnw' in lp_text:
-            return 'HNW Individual'
-        else:
-            return 'GP Investor'
+        # One scan for every keyword, then resolve in priority order
+        found = set(_CATEGORY_RE.findall(lp_text))
+        for category, keywords in _CATEGORY_KEYWORDS:
+            if found & keywords:
+                return category
+        return 'GP Investor'
     
-    def _calculate_confidence_score(self, lp: Dict) -> int:
-        """Calculate confidence score (0-100) based on data completeness"""
-        score = 0
-        
-        # Name present (required)
-        if lp.get('name'):
-            score += 30
-        
-        # Contact info present
-        if lp.get('Email or website') or lp.get('Contact information') or lp.get('email'):
-            score += 25
-        
-        # Investment focus described
-        if lp.get('Investment focus/industries') or lp.get('Investment interests'):
-            score += 20
-        
-        # Deal history present
-        if lp.get('Notable deals or portfolio companies') or lp.get('Notable investments'):
-            score += 15
-        
-        # Additional details
-        if lp.get('Investment size preference') or lp.get('Preferences'):
-            score += 10
-        
-        return min(score, 100)
+    def _calculate_confidence_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """Confidence scores (0-100) from data completeness: (N, fields) fill mask @ weights"""
+        filled = (df[_CONFIDENCE_FIELDS] != '').to_numpy(dtype=bool)
+        return np.minimum(filled @ _CONFIDENCE_VECTOR, 100)
     
-    def _deduplicate_lps(self, lps: List[Dict]) -> List[Dict]:
-        """Remove duplicate LPs based on firm name similarity"""
-        unique_lps = []
-        seen_names = set()
+    def _is_new_firm(self, firm: str, seen_names: Set[str], buckets: Dict[str, List[str]],
+                     fuzzy: bool = True) -> bool:
+        """Record a firm; False if it (or, when fuzzy, a near-duplicate) was already seen"""
+        tokens = _firm_tokens(firm)
+        name_key = ''.join(tokens)
+        if not name_key or name_key in seen_names:
+            return False
         
-        for lp in lps:
-            name_key = lp.get('Firm', lp.get('LP_Name', '')).lower().strip()
-            
-            if name_key and name_key not in seen_names:
-                seen_names.add(name_key)
-                unique_lps.append(lp)
+        # Near-duplicate candidates share every word but the last, so only a
+        # trailing difference ("Fund II" vs "Fund III") can merge two firms
+        if fuzzy and len(tokens) > 1:
+            bucket = buckets.setdefault(' '.join(tokens[:-1]), [])
+            if any(SequenceMatcher(None, name_key, other).ratio() >= FUZZY_MATCH_THRESHOLD
+                   for other in bucket):
+                return False
+            bucket.append(name_key)
         
-        return unique_lps
+        seen_names.add(name_key)
+        return True
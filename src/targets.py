@@ -2,9 +2,24 @@
 Daily Target List Generator for LP Outreach
 Creates prioritized lists of LPs for daily outreach activities
 """
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from datetime import datetime
 from typing import Optional
+from .agent import industry_pattern
+
+# Columns read per target when building the summary report
+REPORT_COLUMNS = [
+    'LP_Name', 'Firm', 'LP_Category', 'Email', 'Interests', 'Deal_History',
+    'Investment_Preferences', 'Confidence_Score', 'Industries',
+    'EBITDA_Range', 'Revenue_Range'
+]
+
+def _has_value(value):
+    """True for present, non-empty cell values"""
+    return value is not None and pd.notna(value) and value != ''
 
 class DailyTargetGenerator:
     """Generates daily target lists from LP database"""
@@ -43,9 +58,9 @@ class DailyTargetGenerator:
             ]
         
         if industries:
-            industry_mask = targets['Industries'].str.contains(
-                '|'.join(industries), case=False, na=False
-            )
+            # Cached, escaped alternation; a plain string keeps Arrow columns on the native kernel
+            pattern = industry_pattern(tuple(sorted(industries)))
+            industry_mask = targets['Industries'].str.contains(pattern, case=False, na=False)
             targets = targets[industry_mask]
         
         if targets.empty:
@@ -65,31 +80,34 @@ class DailyTargetGenerator:
     
     def _calculate_priority_scores(self, targets, prioritize_category=None):
         """Calculate priority scores for each LP"""
-        targets['Priority_Score'] = 0.0
-        
         # 1. Confidence score (0-50 points)
-        confidence = pd.to_numeric(targets['Confidence_Score'], errors='coerce').fillna(0)
-        targets['Priority_Score'] += confidence * 0.5
+        confidence = pd.to_numeric(targets['Confidence_Score'], errors='coerce').fillna(0).to_numpy()
         
         # 2. Status priority (30 points for Prospect, 15 for Contacted)
-        targets.loc[targets['Status'] == 'Prospect', 'Priority_Score'] += 30
-        targets.loc[targets['Status'] == 'Contacted', 'Priority_Score'] += 15
+        is_prospect = targets['Status'].eq('Prospect').to_numpy(dtype=bool, na_value=False)
+        is_contacted = targets['Status'].eq('Contacted').to_numpy(dtype=bool, na_value=False)
+        status_score = np.where(is_prospect, 30, np.where(is_contacted, 15, 0))
         
         # 3. Category priority (20 points if matches prioritize_category)
+        category_score = 0
         if prioritize_category:
-            targets.loc[targets['LP_Category'] == prioritize_category, 'Priority_Score'] += 20
+            category_score = 20 * targets['LP_Category'].eq(prioritize_category).to_numpy(dtype=bool, na_value=False)
         
-        # 4. Recency bonus (10 points for recently discovered)
+        # 4. Recency bonus (10 points for recently discovered; none if date unknown)
+        recency_score = 0
         if 'Discovery_Date' in targets.columns:
-            targets['Discovery_Date'] = pd.to_datetime(targets['Discovery_Date'], errors='coerce')
-            days_since_discovery = (datetime.now() - targets['Discovery_Date']).dt.days
+            discovery_date = pd.to_datetime(targets['Discovery_Date'], errors='coerce')
+            days_since_discovery = (datetime.now() - discovery_date).dt.days
             # More recent = higher score
-            recency_score = (30 - days_since_discovery).clip(lower=0, upper=10)
-            targets['Priority_Score'] += recency_score
+            recency_score = (30 - days_since_discovery).clip(lower=0, upper=10).fillna(0).to_numpy()
         
         # 5. Deal history bonus (10 points if has notable deals)
-        has_deals = targets['Deal_History'].notna() & (targets['Deal_History'] != '')
-        targets.loc[has_deals, 'Priority_Score'] += 10
+        has_deals = (targets['Deal_History'].notna() & (targets['Deal_History'] != '')).to_numpy(dtype=bool, na_value=False)
+        
+        # Single column write instead of one masked update per rule
+        targets['Priority_Score'] = (
+            confidence * 0.5 + status_score + category_score + recency_score + 10 * has_deals
+        )
         
         return targets
     
@@ -98,27 +116,24 @@ class DailyTargetGenerator:
         if 'LP_Category' not in targets.columns:
             return targets
         
-        categories = targets['LP_Category'].unique()
-        if len(categories) <= 1:
+        num_categories = targets['LP_Category'].nunique(dropna=False)
+        if num_categories <= 1:
             return targets
         
         # Aim for balanced representation
-        per_category = max(2, target_count // len(categories))
-        
-        balanced = []
-        for category in categories:
-            category_lps = targets[targets['LP_Category'] == category].head(per_category)
-            balanced.append(category_lps)
+        per_category = max(2, target_count // num_categories)
         
-        balanced_df = pd.concat(balanced, ignore_index=True)
+        # Top per_category of each category by priority, as one selection mask
+        ranked = targets.sort_values('Priority_Score', ascending=False)
+        selected = (ranked.groupby('LP_Category', sort=False, dropna=False).cumcount() < per_category).to_numpy(copy=True)
         
         # If we don't have enough, fill with highest priority remaining
-        if len(balanced_df) < target_count:
-            remaining = targets[~targets.index.isin(balanced_df.index)]
-            additional = remaining.nlargest(target_count - len(balanced_df), 'Priority_Score')
-            balanced_df = pd.concat([balanced_df, additional], ignore_index=True)
+        shortfall = target_count - selected.sum()
+        if shortfall > 0:
+            remaining = ~selected
+            selected |= remaining & (remaining.cumsum() <= shortfall)
         
-        return balanced_df
+        return ranked[selected]
     
     def export_to_csv(self, targets, filename=None):
         """Export daily target list to CSV"""
@@ -138,7 +153,8 @@ class DailyTargetGenerator:
         available_cols = [col for col in export_cols if col in targets.columns]
         export_df = targets[available_cols]
         
-        export_df.to_csv(filename, index=False)
+        # Arrow's C++ CSV writer instead of pandas' Python-level row loop
+        pacsv.write_csv(pa.Table.from_pandas(export_df, preserve_index=False), filename)
         print(f"Daily target list exported to {filename}")
         return filename
     
@@ -147,52 +163,62 @@ class DailyTargetGenerator:
         if targets.empty:
             return "No targets available for today."
         
-        report = f"# Daily LP Outreach Targets - {datetime.now().strftime('%Y-%m-%d')}\n\n"
+        parts = [f"# Daily LP Outreach Targets - {datetime.now().strftime('%Y-%m-%d')}\n\n"]
         
         # Summary statistics
-        report += "## Summary\n\n"
-        report += f"- **Total Targets**: {len(targets)}\n"
+        parts.append("## Summary\n\n")
+        parts.append(f"- **Total Targets**: {len(targets)}\n")
         
         if 'LP_Category' in targets.columns:
             category_counts = targets['LP_Category'].value_counts()
-            report += f"- **By Category**:\n"
+            parts.append(f"- **By Category**:\n")
             for category, count in category_counts.items():
-                report += f"  - {category}: {count}\n"
+                parts.append(f"  - {category}: {count}\n")
         
         if 'Confidence_Score' in targets.columns:
             avg_confidence = targets['Confidence_Score'].mean()
-            report += f"- **Average Confidence Score**: {avg_confidence:.1f}%\n"
+            parts.append(f"- **Average Confidence Score**: {avg_confidence:.1f}%\n")
         
-        report += "\n---\n\n"
+        parts.append("\n---\n\n")
         
         # Top targets by category
-        report += "## Recommended Outreach Order\n\n"
-        
-        for i, (_, lp) in enumerate(targets.iterrows(), 1):
-            report += f"### {i}. {lp['LP_Name']}\n\n"
-            report += f"- **Firm**: {lp['Firm']}\n"
-            if 'LP_Category' in lp and pd.notna(lp['LP_Category']):
-                report += f"- **Category**: {lp['LP_Category']}\n"
-            if 'Email' in lp and pd.notna(lp['Email']):
-                report += f"- **Contact**: {lp['Email']}\n"
-            if 'Interests' in lp and pd.notna(lp['Interests']):
-                report += f"- **Focus**: {lp['Interests']}\n"
-            if 'Deal_History' in lp and pd.notna(lp['Deal_History']):
-                deal_history = str(lp['Deal_History'])[:150]
-                report += f"- **Notable Deals**: {deal_history}\n"
-            if 'Investment_Preferences' in lp and pd.notna(lp['Investment_Preferences']):
-                report += f"- **Preferences**: {lp['Investment_Preferences']}\n"
-            if 'Confidence_Score' in lp and pd.notna(lp['Confidence_Score']):
-                report += f"- **Confidence**: {lp['Confidence_Score']}%\n"
+        parts.append("## Recommended Outreach Order\n\n")
+        
+        available_cols = [col for col in REPORT_COLUMNS if col in targets.columns]
+        for i, lp in enumerate(targets[available_cols].itertuples(index=False), 1):
+            category = getattr(lp, 'LP_Category', None)
+            email = getattr(lp, 'Email', None)
+            interests = getattr(lp, 'Interests', None)
+            deal_history = getattr(lp, 'Deal_History', None)
+            preferences = getattr(lp, 'Investment_Preferences', None)
+            confidence = getattr(lp, 'Confidence_Score', None)
+            industries = getattr(lp, 'Industries', None)
+            ebitda_range = getattr(lp, 'EBITDA_Range', None)
+            revenue_range = getattr(lp, 'Revenue_Range', None)
+            
+            parts.append(f"### {i}. {lp.LP_Name}\n\n")
+            parts.append(f"- **Firm**: {lp.Firm}\n")
+            if _has_value(category):
+                parts.append(f"- **Category**: {category}\n")
+            if _has_value(email):
+                parts.append(f"- **Contact**: {email}\n")
+            if _has_value(interests):
+                parts.append(f"- **Focus**: {interests}\n")
+            if _has_value(deal_history):
+                parts.append(f"- **Notable Deals**: {str(deal_history)[:150]}\n")
+            if _has_value(preferences):
+                parts.append(f"- **Preferences**: {preferences}\n")
+            if _has_value(confidence):
+                parts.append(f"- **Confidence**: {confidence}%\n")
             
-            report += f"\n**Key Talking Points**:\n"
-            if 'Industries' in lp and pd.notna(lp['Industries']):
-                report += f"- Alignment with {lp['Industries']} focus\n"
-            if 'EBITDA_Range' in lp and pd.notna(lp['EBITDA_Range']):
-                report += f"- Target EBITDA range: {lp['EBITDA_Range']}\n"
-            if 'Revenue_Range' in lp and pd.notna(lp['Revenue_Range']):
-                report += f"- Target revenue range: {lp['Revenue_Range']}\n"
+            parts.append(f"\n**Key Talking Points**:\n")
+            if _has_value(industries):
+                parts.append(f"- Alignment with {industries} focus\n")
+            if _has_value(ebitda_range):
+                parts.append(f"- Target EBITDA range: {ebitda_range}\n")
+            if _has_value(revenue_range):
+                parts.append(f"- Target revenue range: {revenue_range}\n")
             
-            report += "\n---\n\n"
+            parts.append("\n---\n\n")
         
-        return report
+        return ''.join(parts)
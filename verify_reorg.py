@@ -2,11 +2,8 @@
 Verification script for LP Outreach Agent (Post-Reorganization)
 Tests configuration loading and API connectivity
 """
-import sys
-import os
 from src.config import load_config
 from google import genai
-from google.genai import types
 
 def test_config():
     print("Testing configuration loading...")